@@ -4,9 +4,22 @@ Professional camera interface with error handling and configuration
 """
 
 import cv2
+import sys
 import time
+import threading
+from queue import Queue, Empty
 from typing import Optional, Tuple
-from config import Config
+from concurrent.futures import ThreadPoolExecutor
+from config import Config, CFG
+
+
+def _probe_backend() -> int:
+    """Capture backend that opens fastest on this platform"""
+    if sys.platform.startswith('linux'):
+        return cv2.CAP_V4L2
+    if sys.platform == 'win32':
+        return cv2.CAP_MSMF
+    return cv2.CAP_ANY
 
 
 class CameraHandler:
@@ -21,7 +34,7 @@ class CameraHandler:
     - Error handling
     """
     
-    def __init__(self, camera_id: int = 0, config: Config = Config):
+    def __init__(self, camera_id: int = 0, config: Config = CFG):
         """
         Initialize Camera Handler
         
@@ -52,7 +65,9 @@ class CameraHandler:
                 print(f"Failed to open camera {self.camera_id}")
                 return False
             
-            # Set camera properties
+            # Set camera properties (codec first, some drivers reset size on change)
+            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*self.config.CAMERA_FOURCC))
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, self.config.CAMERA_BUFFER_SIZE)
             self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.config.CAMERA_WIDTH)
             self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.config.CAMERA_HEIGHT)
             self.cap.set(cv2.CAP_PROP_FPS, self.config.CAMERA_FPS)
@@ -61,10 +76,12 @@ class CameraHandler:
             actual_width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
             actual_height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
             actual_fps = int(self.cap.get(cv2.CAP_PROP_FPS))
+            actual_fourcc = self._get_fourcc()
             
             print(f"Camera initialized successfully!")
             print(f"Resolution: {actual_width}x{actual_height}")
             print(f"FPS: {actual_fps}")
+            print(f"Codec: {actual_fourcc}")
             
             self.is_opened = True
             return True
@@ -74,6 +91,11 @@ class CameraHandler:
             self.is_opened = False
             return False
     
+    def _get_fourcc(self) -> str:
+        """Get the active capture codec as a four-character string"""
+        code = int(self.cap.get(cv2.CAP_PROP_FOURCC))
+        return "".join(chr((code >> (8 * i)) & 0xFF) for i in range(4))
+    
     def read_frame(self) -> Tuple[bool, Optional[cv2.Mat]]:
         """
         Read a frame from camera
@@ -97,6 +119,65 @@ class CameraHandler:
             print(f"Error reading frame: {e}")
             return False, None
     
+    def grab_frame(self) -> bool:
+        """
+        Grab the next frame without decoding it
+        
+        Returns:
+            True if a frame was grabbed, False otherwise
+        """
+        if not self.is_opened or self.cap is None:
+            return False
+        
+        try:
+            return self.cap.grab()
+        except Exception as e:
+            print(f"Error grabbing frame: {e}")
+            return False
+    
+    def retrieve_frame(self) -> Tuple[bool, Optional[cv2.Mat]]:
+        """
+        Decode the most recently grabbed frame
+        
+        Returns:
+            Tuple of (success, frame)
+        """
+        if not self.is_opened or self.cap is None:
+            return False, None
+        
+        try:
+            ret, frame = self.cap.retrieve()
+            
+            if not ret:
+                print("Failed to retrieve frame from camera")
+                return False, None
+            
+            return True, frame
+            
+        except Exception as e:
+            print(f"Error retrieving frame: {e}")
+            return False, None
+    
+    def read_latest_frame(self, skip: int = 1) -> Tuple[bool, Optional[cv2.Mat]]:
+        """
+        Grab several frames and decode only the last one
+        
+        Frames that would be dropped anyway are never decoded, which
+        frees CPU time for inference.
+        
+        Args:
+            skip: Number of frames to grab before decoding (1 = every frame)
+            
+        Returns:
+            Tuple of (success, frame)
+        """
+        for _ in range(max(1, skip)):
+            if not self.grab_frame():
+                print("Failed to grab frame from camera")
+                return False, None
+        
+        return self.retrieve_frame()
+    
     def release(self):
         """Release camera resources"""
         if self.cap is not None:
@@ -104,16 +185,25 @@ class CameraHandler:
             self.is_opened = False
             print("Camera released")
     
-    def reconnect(self) -> bool:
+    def reconnect(self, stop_event: Optional[threading.Event] = None) -> bool:
         """
         Attempt to reconnect to camera
         
+        Args:
+            stop_event: Event that aborts the reconnect when set (e.g. on shutdown)
+            
         Returns:
             True if successful, False otherwise
         """
         print("Attempting to reconnect camera...")
         self.release()
-        time.sleep(1)
+        
+        if stop_event is None:
+            time.sleep(1)
+        elif stop_event.wait(1):
+            # Shutting down, do not reopen the camera
+            return False
+        
         return self._initialize_camera()
     
     def get_camera_info(self) -> dict:
@@ -126,6 +216,7 @@ class CameraHandler:
             'width': int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
             'height': int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
             'fps': int(self.cap.get(cv2.CAP_PROP_FPS)),
+            'fourcc': self._get_fourcc(),
             'backend': self.cap.getBackendName()
         }
     
@@ -133,23 +224,117 @@ class CameraHandler:
         """Check if camera is available"""
         return self.is_opened and self.cap is not None and self.cap.isOpened()
     
+    @staticmethod
+    def _probe_camera(camera_id: int) -> Optional[int]:
+        """
+        Check whether a camera can be opened
+        
+        Args:
+            camera_id: Camera device ID to probe
+            
+        Returns:
+            camera_id if available, None otherwise
+        """
+        cap = cv2.VideoCapture(camera_id, _probe_backend())
+        try:
+            return camera_id if cap.isOpened() else None
+        finally:
+            cap.release()
+    
     @staticmethod
     def list_available_cameras(max_cameras: int = 5) -> list:
         """
         List available cameras
         
+        Devices are probed in parallel so their driver start-up times overlap.
+        
         Args:
             max_cameras: Maximum number of cameras to check
             
         Returns:
             List of available camera IDs
         """
-        available_cameras = []
+        if max_cameras <= 0:
+            return []
         
-        for i in range(max_cameras):
-            cap = cv2.VideoCapture(i)
-            if cap.isOpened():
-                available_cameras.append(i)
-                cap.release()
+        with ThreadPoolExecutor(max_workers=max_cameras) as executor:
+            results = executor.map(CameraHandler._probe_camera, range(max_cameras))
         
-        return available_cameras
+        return [camera_id for camera_id in results if camera_id is not None]
+
+
+class FrameGrabber(threading.Thread):
+    """
+    Background capture thread
+    
+    Keeps only the freshest frame in a single-slot queue so the consumer
+    never processes stale frames while inference is running. A None
+    frame is queued when the camera is lost and cannot be reconnected.
+    """
+    
+    def __init__(self, camera: CameraHandler, skip: int = 1):
+        """
+        Initialize Frame Grabber
+        
+        Args:
+            camera: Opened camera handler to capture from
+            skip: Number of frames to grab per decoded frame
+        """
+        super().__init__(name="FrameGrabber", daemon=True)
+        self.camera = camera
+        self.skip = skip
+        self.queue = Queue(maxsize=1)
+        self._stop_event = threading.Event()
+    
+    def run(self):
+        """Capture loop, replaces any unconsumed frame with the newest one"""
+        while not self._stop_event.is_set():
+            ret, frame = self.camera.read_latest_frame(self.skip)
+            
+            if not ret or frame is None:
+                print("Failed to read frame. Attempting reconnection...")
+                if self._stop_event.is_set():
+                    break
+                if not self.camera.reconnect(self._stop_event):
+                    if self._stop_event.is_set():
+                        break
+                    print("Could not reconnect to camera.")
+                    self._publish(None)
+                    break
+                continue
+            
+            self._publish(frame)
+    
+    def _publish(self, frame):
+        """Drop the oldest queued frame and queue the new one"""
+        try:
+            self.queue.get_nowait()
+        except Empty:
+            pass
+        self.queue.put(frame)
+    
+    def read(self, poll_interval: float = 0.1) -> Optional[cv2.Mat]:
+        """
+        Get the freshest frame
+        
+        Waits as long as the capture thread is running, so slow first frames
+        and reconnects do not end the stream.
+        
+        Args:
+            poll_interval: Seconds between checks of the capture thread state
+            
+        Returns:
+            Frame, or None once the camera is lost or the grabber has stopped
+        """
+        while True:
+            try:
+                return self.queue.get(timeout=poll_interval)
+            except Empty:
+                if self._stop_event.is_set() or not self.is_alive():
+                    return None
+    
+    def stop(self):
+        """Stop the capture thread and wait until it no longer uses the camera"""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join()
@@ -3,52 +3,78 @@ Configuration file for Object Detection System
 """
 
 import os
+import sys
+from dataclasses import dataclass, field
+from typing import Optional, Tuple
 
+# Slotted dataclasses need Python 3.10+
+_DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(frozen=True, **_DATACLASS_OPTIONS)
 class Config:
-    """Configuration class for object detection parameters"""
+    """Configuration for object detection parameters (immutable, use CFG)"""
     
     # Model Configuration
-    MODEL_NAME = "yolov8n.pt"  # Options: yolov8n, yolov8s, yolov8m, yolov8l, yolov8x
-    MODEL_PATH = os.path.join("models", MODEL_NAME)
+    MODEL_NAME: str = "yolov8n.pt"  # Options: yolov8n, yolov8s, yolov8m, yolov8l, yolov8x
+    MODEL_PATH: str = field(init=False)  # models/<MODEL_NAME>
     
     # Detection Parameters
-    CONFIDENCE_THRESHOLD = 0.5  # Minimum confidence for detection (0.0 - 1.0)
-    IOU_THRESHOLD = 0.45  # Intersection over Union threshold for NMS
+    CONFIDENCE_THRESHOLD: float = 0.5  # Minimum confidence for detection (0.0 - 1.0)
+    IOU_THRESHOLD: float = 0.45  # Intersection over Union threshold for NMS
+    CLASS_FILTER: Optional[Tuple[int, ...]] = None  # Class IDs to keep, e.g. (0,) for person only (None = all)
     
     # Camera Configuration
-    CAMERA_ID = 0  # Default camera (0 for built-in, 1+ for external)
-    CAMERA_WIDTH = 640
-    CAMERA_HEIGHT = 480
-    CAMERA_FPS = 30
+    CAMERA_ID: int = 0  # Default camera (0 for built-in, 1+ for external)
+    CAMERA_WIDTH: int = 640
+    CAMERA_HEIGHT: int = 480
+    CAMERA_FPS: int = 30
+    TARGET_INFERENCE_FPS: int = 30  # Frames above this rate are grabbed but not decoded
+    CAMERA_FOURCC: str = "MJPG"  # Capture codec (MJPG decodes fast and fits USB2 bandwidth)
+    CAMERA_BUFFER_SIZE: int = 1  # Driver frame buffer size (1 = always the newest frame)
     
     # Display Configuration
-    SHOW_FPS = True
-    SHOW_CONFIDENCE = True
-    SHOW_LABELS = True
-    WINDOW_NAME = "Object Detection - YOLOv8"
+    SHOW_FPS: bool = True
+    SHOW_CONFIDENCE: bool = True
+    SHOW_LABELS: bool = True
+    WINDOW_NAME: str = "Object Detection - YOLOv8"
+    DISPLAY_EVERY_N: int = 1  # Draw and show every Nth frame (detection still runs on all)
     
     # Colors (BGR format for OpenCV)
-    BOX_COLOR = (0, 255, 0)  # Green
-    TEXT_COLOR = (255, 255, 255)  # White
-    TEXT_BG_COLOR = (0, 255, 0)  # Green
-    FPS_COLOR = (0, 255, 255)  # Yellow
+    BOX_COLOR: Tuple[int, int, int] = (0, 255, 0)  # Green
+    TEXT_COLOR: Tuple[int, int, int] = (255, 255, 255)  # White
+    TEXT_BG_COLOR: Tuple[int, int, int] = (0, 255, 0)  # Green
+    FPS_COLOR: Tuple[int, int, int] = (0, 255, 255)  # Yellow
     
     # Font Configuration
-    FONT = 0  # cv2.FONT_HERSHEY_SIMPLEX
-    FONT_SCALE = 0.6
-    FONT_THICKNESS = 2
-    BOX_THICKNESS = 2
+    FONT: int = 0  # cv2.FONT_HERSHEY_SIMPLEX
+    FONT_SCALE: float = 0.6
+    FONT_THICKNESS: int = 2
+    BOX_THICKNESS: int = 2
     
     # Recording Configuration
-    ENABLE_RECORDING = False
-    OUTPUT_DIR = "outputs"
-    SAVE_DETECTIONS = False
+    ENABLE_RECORDING: bool = False
+    OUTPUT_DIR: str = "outputs"
+    SAVE_DETECTIONS: bool = False
+    RECORDING_QUEUE_SIZE: int = 32  # Frames buffered for the background video encoder
     
     # Performance
-    USE_GPU = True  # Set to False to use CPU only
+    USE_GPU: bool = True  # Set to False to use CPU only
+    BATCH_SIZE: int = 1  # Frames per inference call (higher = more throughput, more latency)
+    WARMUP_RUNS: int = 3  # Dummy inferences at load time to avoid a first-frame stall
+    PIPELINE_QUEUE_SIZE: int = 2  # Result batches buffered between inference and display
+    USE_UMAT: bool = False  # Draw annotations on OpenCL UMat frames (if OpenCL is available)
+    USE_TENSORRT: bool = False  # Export and run an INT8 TensorRT engine on GPU (one-time export)
+    TENSORRT_CALIBRATION_DATA: str = "coco8.yaml"  # Dataset used for INT8 calibration
+    
+    def __post_init__(self):
+        object.__setattr__(self, 'MODEL_PATH', os.path.join("models", self.MODEL_NAME))
     
-    @classmethod
-    def create_directories(cls):
+    def create_directories(self):
         """Create necessary directories if they don't exist"""
         os.makedirs("models", exist_ok=True)
-        os.makedirs(cls.OUTPUT_DIR, exist_ok=True)
+        os.makedirs(self.OUTPUT_DIR, exist_ok=True)
+
+
+# Shared configuration instance
+CFG = Config()
@@ -3,12 +3,55 @@ Object Detection Module using YOLOv8
 Professional implementation with error handling and optimization
 """
 
+import os
 import cv2
 import time
+import shutil
+import threading
 import numpy as np
+from queue import Queue, Empty, Full
 from ultralytics import YOLO
+from functools import lru_cache
+from dataclasses import dataclass
 from typing import Tuple, List, Optional
-from config import Config
+from config import Config, CFG
+from detector_kernels import filter_by_class
+
+
+@lru_cache(maxsize=1024)
+def _label_size(text: str, font: int, font_scale: float, thickness: int):
+    """Cached cv2.getTextSize, returns ((width, height), baseline)"""
+    return cv2.getTextSize(text, font, font_scale, thickness)
+
+
+@dataclass
+class Detections:
+    """
+    Detections of one frame stored as parallel arrays
+    
+    Attributes:
+        bboxes: (N, 4) int32 array of x1, y1, x2, y2
+        confs: (N,) float32 array of confidences
+        class_ids: (N,) int32 array of class IDs
+        names: Class name of each detection
+    """
+    bboxes: np.ndarray
+    confs: np.ndarray
+    class_ids: np.ndarray
+    names: List[str]
+    
+    def __len__(self) -> int:
+        return len(self.confs)
+    
+    @classmethod
+    def empty(cls) -> "Detections":
+        """Create an empty detection set"""
+        return cls(
+            bboxes=np.empty((0, 4), dtype=np.int32),
+            confs=np.empty(0, dtype=np.float32),
+            class_ids=np.empty(0, dtype=np.int32),
+            names=[]
+        )
 
 
 class ObjectDetector:
@@ -23,23 +66,47 @@ class ObjectDetector:
     - Error handling and logging
     """
     
-    def __init__(self, model_path: Optional[str] = None, config: Config = Config):
+    def __init__(self, model_path: Optional[str] = None, config: Config = CFG,
+                 batch_size: Optional[int] = None, buffer_count: Optional[int] = None):
         """
         Initialize the Object Detector
         
         Args:
             model_path: Path to YOLO model file
             config: Configuration object
+            batch_size: Frames per inference call (TensorRT engines are built for it)
+            buffer_count: Number of annotated frames kept alive before a
+                buffer is reused (defaults to batch_size)
         """
         self.config = config
         self.model_path = model_path or config.MODEL_PATH
+        self.batch_size = max(1, batch_size or config.BATCH_SIZE)
+        self.buffer_count = max(self.batch_size, buffer_count or self.batch_size)
         self.model = None
         self.class_names = []
+        self.device = 'cpu'
+        self.half = False
+        self.imgsz = None
+        
+        # Class IDs to keep (None keeps every class)
+        self._keep_classes = None
+        if config.CLASS_FILTER is not None:
+            self._keep_classes = np.asarray(config.CLASS_FILTER, dtype=np.int32)
+        
+        # Annotate on OpenCL-backed UMat frames when enabled and supported
+        self.use_umat = config.USE_UMAT and cv2.ocl.haveOpenCL()
+        if self.use_umat:
+            cv2.ocl.setUseOpenCL(True)
+        
+        # Ring of reused output buffers for annotated frames
+        self._annot_bufs = [None] * self.buffer_count
+        self._annot_next = 0
         
-        # Performance tracking
+        # Performance tracking (monotonic clock, exponentially smoothed FPS)
         self.fps = 0
-        self.frame_count = 0
-        self.start_time = time.time()
+        self._frame_dt = 0.0
+        self._perf = time.perf_counter
+        self._last_time = None
         
         # Initialize model
         self._load_model()
@@ -54,21 +121,135 @@ class ObjectDetector:
             self.class_names = self.model.names
             print(f"Model loaded successfully!")
             print(f"Available classes: {len(self.class_names)}")
-            
-            # Set device (GPU/CPU)
-            if self.config.USE_GPU:
-                print("Using GPU acceleration (if available)")
-            else:
-                print("Using CPU only")
                 
         except Exception as e:
             print(f"Error loading model: {e}")
             print("Model will be downloaded automatically on first use.")
             # Model will auto-download if not found
-            self.model = YOLO(Config.MODEL_NAME)
+            self.model = YOLO(self.config.MODEL_NAME)
             self.class_names = self.model.names
+        
+        # Set device (GPU/CPU)
+        self.device = self._select_device()
+        self.half = self.device == 'cuda'
+        
+        # Prefer a TensorRT engine on GPU, exporting it once if needed
+        engine_path = None
+        if self.half and self.config.USE_TENSORRT:
+            engine_path = self._maybe_export_engine()
+        
+        engine_model = None
+        if engine_path is not None:
+            try:
+                print(f"Loading TensorRT engine: {engine_path}")
+                engine_model = YOLO(engine_path, task='detect')
+            except Exception as e:
+                print(f"Error loading TensorRT engine: {e}")
+                print("Falling back to PyTorch model.")
+        
+        if engine_model is not None:
+            self.model = engine_model
+            self.model_path = engine_path
+            # Engines are built for a fixed input shape
+            self.imgsz = (self.config.CAMERA_HEIGHT, self.config.CAMERA_WIDTH)
+            print("Using GPU acceleration (TensorRT)")
+        elif self.half:
+            self.model.to(self.device)
+            print("Using GPU acceleration (FP16)")
+        else:
+            self.model.to(self.device)
+            print("Using CPU only")
+        
+        self._warmup()
+    
+    def _predict(self, frames: List[np.ndarray]):
+        """Run the model on a list of frames with the configured settings"""
+        return self.model(
+            list(frames),
+            conf=self.config.CONFIDENCE_THRESHOLD,
+            iou=self.config.IOU_THRESHOLD,
+            device=self.device,
+            half=self.half,
+            verbose=False,
+            **({'imgsz': self.imgsz} if self.imgsz else {})
+        )
+    
+    def _warmup(self):
+        """Run dummy inferences so kernel setup happens before the first frame"""
+        # Numba compiles lazily, trigger it now instead of on the first detection
+        if self._keep_classes is not None:
+            filter_by_class(np.empty(0, dtype=np.int32), self._keep_classes)
+        
+        # Only CUDA has autotuning and context setup worth priming; on CPU
+        # warmup would just add full inferences to startup
+        runs = self.config.WARMUP_RUNS
+        if runs <= 0 or self.device != 'cuda':
+            return
+        
+        try:
+            print("Warming up model...")
+            dummy = np.zeros(
+                (self.config.CAMERA_HEIGHT, self.config.CAMERA_WIDTH, 3), dtype=np.uint8
+            )
+            batch = [dummy] * self.batch_size
+            for _ in range(runs):
+                self._predict(batch)
+        except Exception as e:
+            print(f"Model warmup failed: {e}")
+    
+    def _select_device(self) -> str:
+        """Select CUDA when enabled and available, otherwise CPU"""
+        if not self.config.USE_GPU:
+            return 'cpu'
+        
+        try:
+            import torch
+            return 'cuda' if torch.cuda.is_available() else 'cpu'
+        except ImportError:
+            return 'cpu'
     
-    def detect_objects(self, frame: np.ndarray) -> Tuple[np.ndarray, List]:
+    def _engine_path(self) -> str:
+        """Path of the TensorRT engine matching the model, input shape and batch size"""
+        base = os.path.splitext(self.model_path)[0]
+        height, width = self.config.CAMERA_HEIGHT, self.config.CAMERA_WIDTH
+        return f"{base}_{height}x{width}_b{self.batch_size}.engine"
+    
+    def _maybe_export_engine(self) -> Optional[str]:
+        """
+        Export the model to an INT8 TensorRT engine if not already present
+        
+        Returns:
+            Path to the engine, or None if export is not possible
+        """
+        engine_path = self._engine_path()
+        if os.path.exists(engine_path):
+            return engine_path
+        
+        try:
+            print("Exporting TensorRT engine (one-time, may take several minutes)...")
+            exported = self.model.export(
+                format='engine',
+                imgsz=(self.config.CAMERA_HEIGHT, self.config.CAMERA_WIDTH),
+                batch=self.batch_size,
+                half=True,
+                int8=True,
+                dynamic=False,
+                data=self.config.TENSORRT_CALIBRATION_DATA,
+                verbose=False
+            )
+            
+            # Ultralytics writes the engine next to the source weights
+            if os.path.abspath(exported) != os.path.abspath(engine_path):
+                shutil.move(exported, engine_path)
+            
+            return engine_path
+            
+        except Exception as e:
+            print(f"TensorRT export failed: {e}")
+            print("Falling back to PyTorch model.")
+            return None
+    
+    def detect_objects(self, frame: np.ndarray) -> Tuple[np.ndarray, Detections]:
         """
         Detect objects in a frame
         
@@ -76,147 +257,215 @@ class ObjectDetector:
             frame: Input image frame (BGR format)
             
         Returns:
-            Tuple of (annotated_frame, detections)
+            Tuple of (annotated_frame, detections). The annotated frame is
+            an internal buffer, reused after buffer_count further frames.
+        """
+        return self.detect_batch([frame])[0]
+    
+    def detect_batch(self, frames: List[np.ndarray],
+                     annotate: Optional[List[bool]] = None) -> List[Tuple[np.ndarray, Detections]]:
+        """
+        Detect objects in several frames with a single model call
+        
+        Args:
+            frames: Input image frames (BGR format)
+            annotate: Per-frame flags, frames flagged False are detected
+                but not drawn (default: draw every frame)
+            
+        Returns:
+            List of (annotated_frame, detections) in input order. Annotated
+            frames are internal buffers, reused after buffer_count further frames,
+            or cv2.UMat when USE_UMAT is enabled. annotated_frame is None for
+            frames that were not drawn.
         """
-        if self.model is None:
-            return frame, []
+        if annotate is None:
+            annotate = [True] * len(frames)
+        
+        if self.model is None or not frames:
+            return [(frame if draw else None, Detections.empty())
+                    for frame, draw in zip(frames, annotate)]
         
         try:
-            # Run inference
-            results = self.model(
-                frame,
-                conf=self.config.CONFIDENCE_THRESHOLD,
-                iou=self.config.IOU_THRESHOLD,
-                verbose=False
-            )
+            # Run inference on the whole batch
+            results = self._predict(frames)
             
-            # Get detections
-            detections = []
+            # Every frame of one call needs its own buffer
+            self._ensure_buffer_count(len(frames))
             
-            for result in results:
-                boxes = result.boxes
+            outputs = []
+            for frame, result, draw in zip(frames, results, annotate):
+                detections = self._extract_detections(result)
+                
+                if not draw:
+                    outputs.append((None, detections))
+                    continue
                 
-                for box in boxes:
-                    # Extract box coordinates
-                    x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                    confidence = float(box.conf[0])
-                    class_id = int(box.cls[0])
-                    class_name = self.class_names[class_id]
-                    
-                    detection = {
-                        'bbox': (int(x1), int(y1), int(x2), int(y2)),
-                        'confidence': confidence,
-                        'class_id': class_id,
-                        'class_name': class_name
-                    }
-                    detections.append(detection)
-            
-            # Draw annotations
-            annotated_frame = self._draw_annotations(frame.copy(), detections)
-            
-            return annotated_frame, detections
+                # Draw annotations on a GPU copy, or on a reused host buffer
+                # to avoid per-frame allocation
+                if self.use_umat:
+                    buffer = cv2.UMat(frame)
+                else:
+                    buffer = self._annotation_buffer(frame)
+                annotated_frame = self._draw_annotations(buffer, detections)
+                outputs.append((annotated_frame, detections))
+            
+            return outputs
             
         except Exception as e:
             print(f"Detection error: {e}")
-            return frame, []
+            return [(frame if draw else None, Detections.empty())
+                    for frame, draw in zip(frames, annotate)]
+    
+    def _extract_detections(self, result) -> Detections:
+        """
+        Convert a YOLO result into parallel detection arrays
+        
+        Args:
+            result: Single-image YOLO result
+            
+        Returns:
+            Detections of this result
+        """
+        # Single device-to-host transfer of the [x1, y1, x2, y2, conf, cls] matrix
+        data = result.boxes.data.cpu().numpy()
+        bboxes = data[:, :4].astype(np.int32)
+        confs = data[:, 4].astype(np.float32)
+        class_ids = data[:, 5].astype(np.int32)
+        
+        # Keep only the configured classes
+        if self._keep_classes is not None:
+            mask = filter_by_class(class_ids, self._keep_classes)
+            bboxes, confs, class_ids = bboxes[mask], confs[mask], class_ids[mask]
+        
+        class_names = self.class_names
+        
+        return Detections(
+            bboxes=bboxes,
+            confs=confs,
+            class_ids=class_ids,
+            names=[class_names[class_id] for class_id in class_ids.tolist()]
+        )
+    
+    def _ensure_buffer_count(self, count: int):
+        """Grow the annotation ring to hold at least count buffers"""
+        if count > self.buffer_count:
+            self._annot_bufs.extend([None] * (count - self.buffer_count))
+            self.buffer_count = count
     
-    def _draw_annotations(self, frame: np.ndarray, detections: List) -> np.ndarray:
+    def _annotation_buffer(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Copy frame into the next buffer of the annotation ring
+        
+        Args:
+            frame: Source frame
+            
+        Returns:
+            Buffer holding a copy of frame
+        """
+        index = self._annot_next
+        self._annot_next = (index + 1) % self.buffer_count
+        
+        buffer = self._annot_bufs[index]
+        if buffer is None or buffer.shape != frame.shape:
+            buffer = np.empty_like(frame)
+            self._annot_bufs[index] = buffer
+        
+        np.copyto(buffer, frame)
+        return buffer
+    
+    def _draw_annotations(self, frame: np.ndarray, detections: Detections) -> np.ndarray:
         """
         Draw bounding boxes and labels on frame
         
         Args:
             frame: Input frame
-            detections: List of detection dictionaries
+            detections: Detections of this frame
             
         Returns:
             Annotated frame
         """
-        for det in detections:
-            x1, y1, x2, y2 = det['bbox']
-            confidence = det['confidence']
-            class_name = det['class_name']
-            
-            # Draw bounding box
-            cv2.rectangle(
-                frame,
-                (x1, y1),
-                (x2, y2),
-                self.config.BOX_COLOR,
-                self.config.BOX_THICKNESS
-            )
-            
+        # Bind config lookups once per frame
+        show_confidence = self.config.SHOW_CONFIDENCE
+        font = self.config.FONT
+        font_scale = self.config.FONT_SCALE
+        font_thickness = self.config.FONT_THICKNESS
+        box_color = self.config.BOX_COLOR
+        box_thickness = self.config.BOX_THICKNESS
+        text_color = self.config.TEXT_COLOR
+        text_bg_color = self.config.TEXT_BG_COLOR
+        
+        labels = []
+        
+        # Draw all boxes and label backgrounds first, text afterwards
+        for (x1, y1, x2, y2), confidence, class_name in zip(
+            detections.bboxes.tolist(), detections.confs.tolist(), detections.names
+        ):
             # Prepare label
-            if self.config.SHOW_CONFIDENCE:
-                label = f"{class_name}: {confidence:.2f}"
+            if show_confidence:
+                label = "%s: %.2f" % (class_name, confidence)
             else:
                 label = class_name
             
-            # Get label size for background
-            (label_width, label_height), baseline = cv2.getTextSize(
-                label,
-                self.config.FONT,
-                self.config.FONT_SCALE,
-                self.config.FONT_THICKNESS
+            # Get label size for background (cached, labels repeat across frames)
+            (label_width, label_height), baseline = _label_size(
+                label, font, font_scale, font_thickness
             )
+            text_y = y1 - baseline - 5
             
-            # Draw label background
+            cv2.rectangle(frame, (x1, y1), (x2, y2), box_color, box_thickness)
             cv2.rectangle(
                 frame,
-                (x1, y1 - label_height - baseline - 5),
+                (x1, text_y - label_height),
                 (x1 + label_width, y1),
-                self.config.TEXT_BG_COLOR,
+                text_bg_color,
                 -1
             )
             
-            # Draw label text
+            labels.append((label, (x1, text_y)))
+        
+        # Draw label text
+        for label, origin in labels:
             cv2.putText(
                 frame,
                 label,
-                (x1, y1 - baseline - 5),
-                self.config.FONT,
-                self.config.FONT_SCALE,
-                self.config.TEXT_COLOR,
-                self.config.FONT_THICKNESS
+                origin,
+                font,
+                font_scale,
+                text_color,
+                font_thickness
             )
         
         return frame
     
-    def calculate_fps(self) -> float:
-        """Calculate current FPS"""
-        self.frame_count += 1
-        elapsed_time = time.time() - self.start_time
-        
-        if elapsed_time > 1.0:  # Update FPS every second
-            self.fps = self.frame_count / elapsed_time
-            self.frame_count = 0
-            self.start_time = time.time()
-        
-        return self.fps
-    
-    def draw_fps(self, frame: np.ndarray) -> np.ndarray:
+    def calculate_fps(self, frames: int = 1) -> float:
         """
-        Draw FPS counter on frame
+        Update the detection FPS after processing frames
+        
+        The per-frame interval is smoothed with an exponential moving average
+        and then inverted, so bursts of batched frames average out correctly.
         
         Args:
-            frame: Input frame
+            frames: Number of frames processed since the previous call
             
         Returns:
-            Frame with FPS overlay
-        """
-        fps = self.calculate_fps()
-        fps_text = f"FPS: {fps:.1f}"
-        
-        cv2.putText(
-            frame,
-            fps_text,
-            (10, 30),
-            self.config.FONT,
-            self.config.FONT_SCALE,
-            self.config.FPS_COLOR,
-            self.config.FONT_THICKNESS
-        )
+            Current FPS
+        """
+        now = self._perf()
+        last = self._last_time
+        self._last_time = now
         
-        return frame
+        # First call only starts the clock (model load time is not a frame)
+        if last is None or frames <= 0:
+            return self.fps
+        
+        dt = (now - last) / frames
+        if dt > 0:
+            frame_dt = self._frame_dt
+            # Seed with the first measurement, then smooth
+            self._frame_dt = dt if frame_dt == 0 else 0.9 * frame_dt + 0.1 * dt
+            self.fps = 1.0 / self._frame_dt
+        
+        return self.fps
     
     def get_model_info(self) -> dict:
         """Get information about the loaded model"""
@@ -226,3 +475,99 @@ class ObjectDetector:
             'class_names': self.class_names,
             'confidence_threshold': self.config.CONFIDENCE_THRESHOLD
         }
+
+
+class InferenceWorker(threading.Thread):
+    """
+    Background inference thread
+    
+    Pulls frames from a frame source (e.g. FrameGrabber), runs batched
+    detection and queues the results for the display stage. A None item
+    is queued when the frame source stops delivering frames.
+    """
+    
+    def __init__(self, detector: ObjectDetector, source, batch_size: int = 1,
+                 queue_size: int = 2, annotate_every: int = 1):
+        """
+        Initialize Inference Worker
+        
+        Args:
+            detector: Object detector used for inference
+            source: Object with a read() method returning a frame or None
+            batch_size: Number of frames per inference call
+            queue_size: Maximum number of result batches waiting for display
+            annotate_every: Draw annotations on every Nth frame (0 = never)
+        """
+        super().__init__(name="InferenceWorker", daemon=True)
+        self.detector = detector
+        self.source = source
+        self.batch_size = max(1, batch_size)
+        self.annotate_every = max(0, annotate_every)
+        self.queue = Queue(maxsize=queue_size)
+        self._stop_event = threading.Event()
+    
+    def run(self):
+        """Inference loop, always ends by queueing the None sentinel"""
+        batch = []
+        frame_index = 0
+        every = self.annotate_every
+        
+        try:
+            while not self._stop_event.is_set():
+                frame = self.source.read()
+                
+                if frame is None:
+                    break
+                
+                batch.append(frame)
+                if len(batch) < self.batch_size:
+                    continue
+                
+                # Detect every frame, but only draw the ones to be displayed
+                annotate = [
+                    every > 0 and (frame_index + i) % every == 0
+                    for i in range(len(batch))
+                ]
+                frame_index += len(batch)
+                
+                results = self.detector.detect_batch(batch, annotate)
+                self.detector.calculate_fps(len(batch))
+                batch = []
+                self._put(results)
+        
+        except Exception as e:
+            print(f"Inference worker error: {e}")
+        
+        finally:
+            self._put(None)
+    
+    def _put(self, item):
+        """Queue an item, giving up if the worker is stopped"""
+        while not self._stop_event.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return
+            except Full:
+                continue
+    
+    def read(self, timeout: float = 0.1) -> Optional[List]:
+        """
+        Get the next batch of results
+        
+        Args:
+            timeout: Seconds to wait for results
+            
+        Returns:
+            List of (annotated_frame, detections), an empty list if nothing
+            is ready yet, or None once the worker has finished
+        """
+        try:
+            return self.queue.get(timeout=timeout)
+        except Empty:
+            return []
+    
+    def stop(self):
+        """Stop the inference thread"""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout=1.0)
@@ -0,0 +1,41 @@
+"""
+Detection Post-Processing Kernels
+Per-box loops compiled with Numba when it is installed
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    # Numba is optional; fall back to plain Python with the same signatures
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True)
+def filter_by_class(class_ids: np.ndarray, keep_classes: np.ndarray) -> np.ndarray:
+    """
+    Build a mask of detections whose class is kept
+    
+    Confidence is not checked here, the model already applied the threshold.
+    
+    Args:
+        class_ids: (N,) int32 array of class IDs
+        keep_classes: (K,) int32 array of class IDs to keep
+        
+    Returns:
+        (N,) boolean mask
+    """
+    n = class_ids.shape[0]
+    mask = np.zeros(n, dtype=np.bool_)
+    
+    for i in range(n):
+        for k in range(keep_classes.shape[0]):
+            if class_ids[i] == keep_classes[k]:
+                mask[i] = True
+                break
+    
+    return mask
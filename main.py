@@ -8,37 +8,75 @@ Description: Detects objects in real-time from camera feed using YOLOv8
 
 import cv2
 import sys
+import time
 import argparse
 from datetime import datetime
-from detector import ObjectDetector
-from camera_handler import CameraHandler
-from config import Config
+from detector import ObjectDetector, InferenceWorker
+from camera_handler import CameraHandler, FrameGrabber
+from video_writer import AsyncVideoWriter
+from config import CFG
 
 
 class ObjectDetectionSystem:
     """Main Object Detection System"""
     
-    def __init__(self, camera_id: int = 0):
+    def __init__(self, camera_id: int = 0, batch_size: int = CFG.BATCH_SIZE,
+                 display_every_n: int = CFG.DISPLAY_EVERY_N, headless: bool = False):
         """
         Initialize the detection system
         
         Args:
             camera_id: Camera device ID
+            batch_size: Number of frames per inference call
+            display_every_n: Draw and show every Nth frame
+            headless: Run without drawing or any window
         """
         print("=" * 60)
         print("OBJECT DETECTION SYSTEM - YOLOv8")
         print("=" * 60)
         
         # Create necessary directories
-        Config.create_directories()
+        CFG.create_directories()
         
         # Initialize components
-        self.camera = CameraHandler(camera_id, Config)
-        self.detector = ObjectDetector(config=Config)
+        self.camera = CameraHandler(camera_id, CFG)
+        self.batch_size = max(1, batch_size)
+        self.display_every_n = max(1, display_every_n)
+        # Grab this many frames per decoded frame to match inference rate
+        self.skip = max(1, round(CFG.CAMERA_FPS / CFG.TARGET_INFERENCE_FPS))
+        self.headless = headless
+        # Annotated frames stay alive while queued for display, so the detector
+        # needs enough buffers for every batch in flight
+        buffer_count = self.batch_size * (CFG.PIPELINE_QUEUE_SIZE + 2)
+        self.detector = ObjectDetector(
+            config=CFG, batch_size=self.batch_size, buffer_count=buffer_count
+        )
+        self.grabber = None
+        self.inference = None
         self.is_running = False
         
-        # Video writer for recording
+        # Background video writer for recording
         self.video_writer = None
+        self._record_size = None
+        
+        # Overlay settings bound once instead of per frame
+        self._show_fps = CFG.SHOW_FPS
+        self._overlay_origin = (10, 30)
+        self._overlay_style = (CFG.FONT, CFG.FONT_SCALE, CFG.FPS_COLOR, CFG.FONT_THICKNESS)
+        
+        # Display pacing for adaptive waitKey delays
+        self._frame_budget_ms = 1000.0 * self.display_every_n / CFG.TARGET_INFERENCE_FPS
+        self._last_present = time.perf_counter()
+        
+        # Last displayed frame, used by key presses between results
+        self._last_frame = None
+        self._last_detections = None
+        
+        # How long the display loop waits for results before pumping the GUI
+        self._poll_interval = 0.1 if headless else 0.02
+        
+        # Console status interval for headless mode
+        self._last_status = time.perf_counter()
         
         # Display system info
         self._display_system_info()
@@ -53,6 +91,7 @@ class ObjectDetectionSystem:
             print(f"Camera ID: {camera_info['camera_id']}")
             print(f"Resolution: {camera_info['width']}x{camera_info['height']}")
             print(f"FPS: {camera_info['fps']}")
+            print(f"Codec: {camera_info['fourcc']}")
             print(f"Backend: {camera_info['backend']}")
         
         # Model info
@@ -62,6 +101,11 @@ class ObjectDetectionSystem:
         print(f"Confidence Threshold: {model_info['confidence_threshold']}")
         
         print("\n[CONTROLS]")
+        if self.headless:
+            print("Headless mode: press Ctrl+C to quit")
+            print("=" * 60)
+            print()
+            return
         print("Press 'q' or 'ESC' to quit")
         print("Press 's' to save current frame")
         print("Press 'r' to toggle recording")
@@ -72,7 +116,7 @@ class ObjectDetectionSystem:
     def _save_frame(self, frame, detections):
         """Save current frame with detections"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{Config.OUTPUT_DIR}/detection_{timestamp}.jpg"
+        filename = f"{CFG.OUTPUT_DIR}/detection_{timestamp}.jpg"
         
         cv2.imwrite(filename, frame)
         print(f"Frame saved: {filename}")
@@ -83,13 +127,18 @@ class ObjectDetectionSystem:
         if self.video_writer is None:
             # Start recording
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{Config.OUTPUT_DIR}/recording_{timestamp}.mp4"
+            filename = f"{CFG.OUTPUT_DIR}/recording_{timestamp}.mp4"
             
             fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            fps = Config.CAMERA_FPS
-            frame_size = (frame.shape[1], frame.shape[0])
+            # Only decoded and displayed frames are recorded, keep playback at real speed
+            fps = CFG.CAMERA_FPS / self.skip / self.display_every_n
+            # UMat frames expose their size only after download
+            height, width = (frame.get() if isinstance(frame, cv2.UMat) else frame).shape[:2]
+            self._record_size = (width, height)
             
-            self.video_writer = cv2.VideoWriter(filename, fourcc, fps, frame_size)
+            self.video_writer = AsyncVideoWriter(
+                filename, fourcc, fps, self._record_size, CFG.RECORDING_QUEUE_SIZE
+            )
             print(f"Recording started: {filename}")
         else:
             # Stop recording
@@ -103,14 +152,82 @@ class ObjectDetectionSystem:
         print(f"CURRENT DETECTIONS: {len(detections)}")
         print("=" * 60)
         
-        if detections:
-            for i, det in enumerate(detections, 1):
-                print(f"{i}. {det['class_name']} - Confidence: {det['confidence']:.2%}")
+        if len(detections):
+            for i, (class_name, confidence) in enumerate(
+                zip(detections.names, detections.confs.tolist()), 1
+            ):
+                print(f"{i}. {class_name} - Confidence: {confidence:.2%}")
         else:
             print("No objects detected")
         
         print("=" * 60 + "\n")
     
+    def _present_frame(self, annotated_frame, detections) -> bool:
+        """
+        Draw overlays, record, display and handle keyboard input
+        
+        Returns:
+            False if the user asked to quit, True otherwise
+        """
+        # Draw FPS (if enabled) and detection count in a single overlay
+        if self._show_fps:
+            overlay_text = "FPS: %.1f  Objects: %d" % (self.detector.fps, len(detections))
+        else:
+            overlay_text = "Objects: %d" % len(detections)
+        cv2.putText(annotated_frame, overlay_text, self._overlay_origin, *self._overlay_style)
+        
+        # Record if enabled
+        if self.video_writer is not None:
+            self.video_writer.write(annotated_frame)
+            # Show recording indicator
+            cv2.circle(annotated_frame, (self._record_size[0] - 30, 30), 10, (0, 0, 255), -1)
+        
+        # Display frame
+        cv2.imshow(CFG.WINDOW_NAME, annotated_frame)
+        
+        # Handle keyboard input, blocking only for what is left of the frame
+        # budget instead of polling every millisecond
+        elapsed_ms = (time.perf_counter() - self._last_present) * 1000.0
+        key = cv2.waitKey(max(1, int(self._frame_budget_ms - elapsed_ms))) & 0xFF
+        self._last_present = time.perf_counter()
+        
+        # Remember the shown frame for key presses while waiting on inference
+        self._last_frame = annotated_frame
+        self._last_detections = detections
+        
+        return self._handle_key(key)
+    
+    def _handle_key(self, key: int) -> bool:
+        """
+        Handle a key press against the last displayed frame
+        
+        Returns:
+            False if the user asked to quit, True otherwise
+        """
+        if key == ord('q') or key == 27:  # 'q' or ESC
+            return False
+        
+        # Nothing displayed yet, only quitting is possible
+        if self._last_frame is None:
+            return True
+        
+        if key == ord('s'):  # Save frame
+            self._save_frame(self._last_frame, self._last_detections)
+        elif key == ord('r'):  # Toggle recording
+            self._toggle_recording(self._last_frame)
+        elif key == ord('i'):  # Show info
+            self._show_detection_info(self._last_detections)
+        
+        return True
+    
+    def _report_status(self, detections):
+        """Print FPS and detection count about once per second (headless mode)"""
+        now = time.perf_counter()
+        
+        if now - self._last_status >= 1.0:
+            self._last_status = now
+            print(f"FPS: {self.detector.fps:.1f} | Objects: {len(detections)}")
+    
     def run(self):
         """Run the object detection system"""
         if not self.camera.is_available():
@@ -118,60 +235,53 @@ class ObjectDetectionSystem:
             return
         
         self.is_running = True
-        print("Starting detection... (Press 'q' to quit)\n")
+        if self.headless:
+            print("Starting detection... (Press Ctrl+C to quit)\n")
+        else:
+            print("Starting detection... (Press 'q' to quit)\n")
+        
+        # Capture and inference run in background stages; display stays on
+        # the main thread because GUI backends require it
+        self.grabber = FrameGrabber(self.camera, self.skip)
+        # Headless runs never draw; otherwise only every Nth frame is drawn
+        annotate_every = 0 if self.headless else self.display_every_n
+        self.inference = InferenceWorker(
+            self.detector, self.grabber, self.batch_size,
+            CFG.PIPELINE_QUEUE_SIZE, annotate_every
+        )
+        self.grabber.start()
+        self.inference.start()
         
         try:
             while self.is_running:
-                # Read frame from camera
-                ret, frame = self.camera.read_frame()
+                # Get the next batch of results from the inference stage
+                results = self.inference.read(self._poll_interval)
                 
-                if not ret or frame is None:
-                    print("Failed to read frame. Attempting reconnection...")
-                    if not self.camera.reconnect():
-                        print("Could not reconnect to camera. Exiting...")
+                if results is None:
+                    print("No frame from camera. Exiting...")
+                    break
+                
+                # Keep the window responsive while inference is still running
+                if not results and not self.headless:
+                    if not self._handle_key(cv2.waitKey(1) & 0xFF):
+                        print("\nStopping detection...")
                         break
                     continue
                 
-                # Detect objects
-                annotated_frame, detections = self.detector.detect_objects(frame)
-                
-                # Draw FPS if enabled
-                if Config.SHOW_FPS:
-                    annotated_frame = self.detector.draw_fps(annotated_frame)
-                
-                # Add detection count
-                detection_text = f"Objects: {len(detections)}"
-                cv2.putText(
-                    annotated_frame,
-                    detection_text,
-                    (10, 60),
-                    Config.FONT,
-                    Config.FONT_SCALE,
-                    Config.FPS_COLOR,
-                    Config.FONT_THICKNESS
-                )
-                
-                # Record if enabled
-                if self.video_writer is not None:
-                    self.video_writer.write(annotated_frame)
-                    # Show recording indicator
-                    cv2.circle(annotated_frame, (annotated_frame.shape[1] - 30, 30), 10, (0, 0, 255), -1)
-                
-                # Display frame
-                cv2.imshow(Config.WINDOW_NAME, annotated_frame)
-                
-                # Handle keyboard input
-                key = cv2.waitKey(1) & 0xFF
-                
-                if key == ord('q') or key == 27:  # 'q' or ESC
-                    print("\nStopping detection...")
-                    break
-                elif key == ord('s'):  # Save frame
-                    self._save_frame(annotated_frame, detections)
-                elif key == ord('r'):  # Toggle recording
-                    self._toggle_recording(annotated_frame)
-                elif key == ord('i'):  # Show info
-                    self._show_detection_info(detections)
+                # Display results in capture order
+                for annotated_frame, detections in results:
+                    if self.headless:
+                        self._report_status(detections)
+                        continue
+                    
+                    # Frame skipped by display decimation
+                    if annotated_frame is None:
+                        continue
+                    
+                    if not self._present_frame(annotated_frame, detections):
+                        print("\nStopping detection...")
+                        self.is_running = False
+                        break
         
         except KeyboardInterrupt:
             print("\nInterrupted by user")
@@ -186,11 +296,20 @@ class ObjectDetectionSystem:
         """Clean up resources"""
         print("\nCleaning up...")
         
+        # Stop capture first: the camera must be idle before it is released,
+        # and the inference worker then sees the end of the frame stream
+        if self.grabber is not None:
+            self.grabber.stop()
+        
+        if self.inference is not None:
+            self.inference.stop()
+        
         if self.video_writer is not None:
             self.video_writer.release()
         
         self.camera.release()
-        cv2.destroyAllWindows()
+        if not self.headless:
+            cv2.destroyAllWindows()
         
         print("System shutdown complete")
         print("=" * 60)
@@ -207,6 +326,23 @@ def main():
         default=0,
         help='Camera device ID (default: 0)'
     )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=CFG.BATCH_SIZE,
+        help=f'Frames per inference call (default: {CFG.BATCH_SIZE})'
+    )
+    parser.add_argument(
+        '--display-every',
+        type=int,
+        default=CFG.DISPLAY_EVERY_N,
+        help=f'Draw and show every Nth frame (default: {CFG.DISPLAY_EVERY_N})'
+    )
+    parser.add_argument(
+        '--headless',
+        action='store_true',
+        help='Run detection without drawing or display window'
+    )
     parser.add_argument(
         '--list-cameras',
         action='store_true',
@@ -223,7 +359,12 @@ def main():
         return
     
     # Run detection system
-    system = ObjectDetectionSystem(camera_id=args.camera)
+    system = ObjectDetectionSystem(
+        camera_id=args.camera,
+        batch_size=args.batch_size,
+        display_every_n=args.display_every,
+        headless=args.headless
+    )
     system.run()
 
 
@@ -0,0 +1,89 @@
+"""
+Video Writer Module
+Background video recording so encoding never blocks the display loop
+"""
+
+import cv2
+import threading
+import numpy as np
+from queue import Queue
+from typing import Tuple
+
+
+class AsyncVideoWriter:
+    """
+    Background Video Writer
+    
+    Frames are copied into a pool of preallocated buffers and encoded by a
+    writer thread. When the encoder falls behind and the queue is full,
+    new frames are dropped instead of stalling the caller.
+    """
+    
+    def __init__(self, filename: str, fourcc: int, fps: float,
+                 frame_size: Tuple[int, int], queue_size: int = 32):
+        """
+        Initialize Async Video Writer
+        
+        Args:
+            filename: Output video file path
+            fourcc: FourCC codec code
+            fps: Output frame rate
+            frame_size: Frame size as (width, height)
+            queue_size: Maximum number of frames waiting to be encoded
+        """
+        self.filename = filename
+        self.writer = cv2.VideoWriter(filename, fourcc, fps, frame_size)
+        self.queue = Queue(maxsize=queue_size)
+        self.dropped_frames = 0
+        
+        # Enough buffers for a full queue plus the frame being encoded
+        self._pool = [None] * (queue_size + 2)
+        self._pool_next = 0
+        
+        self._thread = threading.Thread(target=self._run, name="AsyncVideoWriter", daemon=True)
+        self._thread.start()
+    
+    def _run(self):
+        """Encode queued frames until the None sentinel arrives"""
+        while True:
+            frame = self.queue.get()
+            if frame is None:
+                break
+            self.writer.write(frame)
+    
+    def write(self, frame):
+        """
+        Queue a frame for encoding
+        
+        Args:
+            frame: Frame to record (numpy array or cv2.UMat)
+            
+        Returns:
+            True if queued, False if dropped because the encoder is behind
+        """
+        if self.queue.full():
+            self.dropped_frames += 1
+            return False
+        
+        if isinstance(frame, cv2.UMat):
+            # Download already produces an independent host copy
+            buffer = frame.get()
+        else:
+            buffer = self._pool[self._pool_next]
+            if buffer is None or buffer.shape != frame.shape:
+                buffer = np.empty_like(frame)
+                self._pool[self._pool_next] = buffer
+            np.copyto(buffer, frame)
+            self._pool_next = (self._pool_next + 1) % len(self._pool)
+        
+        self.queue.put(buffer)
+        return True
+    
+    def release(self):
+        """Finish encoding queued frames and close the file"""
+        self.queue.put(None)
+        self._thread.join()
+        self.writer.release()
+        
+        if self.dropped_frames:
+            print(f"Recording dropped {self.dropped_frames} frames")